@@ -77,6 +77,7 @@ class DojoAppConfig(AppConfig):
         import dojo.endpoint.signals
         import dojo.engagement.signals
         import dojo.finding_group.signals
+        import dojo.jira_link.signals
         import dojo.notes.signals
         import dojo.product.signals
         import dojo.product_type.signals
@@ -2,7 +2,7 @@ import logging
 import os
 
 from celery import Celery
-from celery.signals import setup_logging
+from celery.signals import setup_logging, worker_process_shutdown
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
@@ -30,6 +30,14 @@ def config_loggers(*args, **kwags):
     dictConfig(settings.LOGGING)
 
 
+# only sent by the prefork pool, whose child processes run the tasks on the thread handling this signal.
+# with the other pools the clients cached by the task threads are released when the worker exits
+@worker_process_shutdown.connect
+def close_jira_connections(*args, **kwargs):
+    from dojo.jira_link.helper import close_jira_connections
+    close_jira_connections()
+
+
 # from celery import current_app
 
 # _ = current_app.loader.import_default_modules()
@@ -1,19 +1,26 @@
-import io
 import json
 import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache, partial
+from itertools import chain
 from pathlib import Path
 from typing import Any
 
 import requests
 from django.conf import settings
 from django.contrib import messages
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from django.template import TemplateDoesNotExist
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
 from jira import JIRA
 from jira.exceptions import JIRAError
-from requests.auth import HTTPBasicAuth
 
 from dojo.celery import app
 from dojo.decorators import dojo_async_task, dojo_model_from_id, dojo_model_to_id
@@ -34,6 +41,7 @@ from dojo.models import (
     User,
 )
 from dojo.notifications.helper import create_notification
+from dojo.request_cache import cache_for_request
 from dojo.utils import (
     add_error_message_to_response,
     get_file_images,
@@ -45,22 +53,34 @@ from dojo.utils import (
 
 logger = logging.getLogger(__name__)
 
-RESOLVED_STATUS = [
+RESOLVED_STATUS = frozenset({
     "Inactive",
     "Mitigated",
     "False Positive",
     "Out of Scope",
     "Duplicate",
-]
+})
 
-OPEN_STATUS = [
+OPEN_STATUS = frozenset({
     "Active",
     "Verified",
-]
+})
+
+# authenticated jira clients per thread, see get_jira_connection()
+_jira_connections = threading.local()
+
+# settings and jira projects looked up while pushing an object to jira, see jira_push_cache()
+_jira_push_cache = ContextVar("jira_push_cache", default=None)
+
+# relations walked by get_jira_project to get from a test to the jira project of its engagement or product
+JIRA_PROJECT_SELECT_RELATED = (
+    "engagement__jira_project__jira_instance",
+    "engagement__product",
+)
 
 
 def is_jira_enabled():
-    if not get_system_setting("enable_jira"):
+    if not _cached_for_push(("enable_jira",), get_system_setting, "enable_jira"):
         logger.debug("JIRA is disabled, not doing anything")
         return False
 
@@ -153,21 +173,23 @@ def can_be_pushed_to_jira(obj, form=None):
 
         logger.debug("can_be_pushed_to_jira: %s, %s, %s", active, verified, severity)
 
-        isenforced = get_system_setting("enforce_verified_status", True) or get_system_setting("enforce_verified_status_jira", True)
+        system_settings = System_Settings.objects.get()
+        isenforced = system_settings.enforce_verified_status or system_settings.enforce_verified_status_jira
 
         if not active or (not verified and isenforced):
             logger.debug("Findings must be active and verified, if enforced by system settings, to be pushed to JIRA")
             return False, "Findings must be active and verified, if enforced by system settings, to be pushed to JIRA", "not_active_or_verified"
 
-        jira_minimum_threshold = None
-        if System_Settings.objects.get().jira_minimum_severity:
-            jira_minimum_threshold = Finding.get_number_severity(System_Settings.objects.get().jira_minimum_severity)
+        jira_minimum_severity = system_settings.jira_minimum_severity
+        if jira_minimum_severity:
+            jira_minimum_threshold = Finding.get_number_severity(jira_minimum_severity)
 
             if jira_minimum_threshold and jira_minimum_threshold > Finding.get_number_severity(severity):
-                logger.debug(f"Finding below the minimum JIRA severity threshold ({System_Settings.objects.get().jira_minimum_severity}).")
-                return False, f"Finding below the minimum JIRA severity threshold ({System_Settings.objects.get().jira_minimum_severity}).", "below_minimum_threshold"
+                logger.debug("Finding below the minimum JIRA severity threshold (%s).", jira_minimum_severity)
+                return False, f"Finding below the minimum JIRA severity threshold ({jira_minimum_severity}).", "below_minimum_threshold"
     elif isinstance(obj, Finding_Group):
-        if not obj.findings.all():
+        # exists() uses prefetched findings when available, otherwise it only probes for a single row
+        if not obj.findings.exists():
             return False, f"{to_str_typed(obj)} cannot be pushed to jira as it is empty.", "error_empty"
         # Determine if the finding group is not active
         if "Active" not in _safely_get_finding_group_status(obj):
@@ -179,8 +201,43 @@ def can_be_pushed_to_jira(obj, form=None):
     return True, None, None
 
 
+@contextmanager
+def jira_push_cache():
+    # a single push checks whether jira is enabled and looks up the jira project of the same object many times
+    # (configuration checks, labels, description, priority, ...). remember the results for the duration of the
+    # push only, so changes to the system settings or jira configuration are still picked up by the next push.
+    if _jira_push_cache.get() is not None:
+        # nested push, keep using the cache of the outer one
+        yield
+        return
+
+    token = _jira_push_cache.set({})
+    try:
+        yield
+    finally:
+        _jira_push_cache.reset(token)
+
+
+def _cached_for_push(key, func, *args, **kwargs):
+    push_cache = _jira_push_cache.get()
+    if push_cache is None:
+        return func(*args, **kwargs)
+
+    if key not in push_cache:
+        push_cache[key] = func(*args, **kwargs)
+    return push_cache[key]
+
+
 # use_inheritance=True means get jira_project config from product if engagement itself has none
 def get_jira_project(obj, *, use_inheritance=True):
+    if getattr(obj, "pk", None) is None:
+        return _get_jira_project(obj, use_inheritance=use_inheritance)
+
+    key = ("jira_project", type(obj).__name__, obj.pk, use_inheritance)
+    return _cached_for_push(key, _get_jira_project, obj, use_inheritance=use_inheritance)
+
+
+def _get_jira_project(obj, *, use_inheritance=True):
     if not is_jira_enabled():
         return None
 
@@ -202,10 +259,10 @@ def get_jira_project(obj, *, use_inheritance=True):
 
     if isinstance(obj, Finding | Stub_Finding):
         finding = obj
-        return get_jira_project(finding.test)
+        return get_jira_project(get_test_with_jira_project(finding))
 
     if isinstance(obj, Finding_Group):
-        return get_jira_project(obj.test)
+        return get_jira_project(get_test_with_jira_project(obj))
 
     if isinstance(obj, Test):
         test = obj
@@ -241,11 +298,21 @@ def get_jira_project(obj, *, use_inheritance=True):
     return None
 
 
-def get_jira_instance(obj):
+def get_test_with_jira_project(obj):
+    # walking from a finding (group) to its jira project lazily costs a query per relation,
+    # so if the test isn't loaded yet, fetch it together with the whole chain in a single query
+    if obj.test_id is not None and not obj._meta.get_field("test").is_cached(obj):
+        obj.test = Test.objects.select_related(*JIRA_PROJECT_SELECT_RELATED).get(pk=obj.test_id)
+    return obj.test
+
+
+# jira_project can be passed in by callers that already looked it up
+def get_jira_instance(obj, *, jira_project=None):
     if not is_jira_enabled():
         return None
 
-    jira_project = get_jira_project(obj)
+    if jira_project is None:
+        jira_project = get_jira_project(obj)
     if jira_project:
         logger.debug("found jira_instance %s for %s", jira_project.jira_instance, obj)
         return jira_project.jira_instance
@@ -273,8 +340,7 @@ def get_jira_url(obj):
 
 def get_jira_issue_url(issue):
     logger.debug("getting jira issue url")
-    jira_project = get_jira_project(issue)
-    jira_instance = get_jira_instance(jira_project)
+    jira_instance = get_jira_instance(issue)
     if jira_instance is None:
         return None
 
@@ -288,8 +354,8 @@ def get_jira_project_url(obj):
 
     if jira_project:
         logger.debug("getting jira project url2")
-        jira_instance = get_jira_instance(obj)
-        if jira_project and jira_instance:
+        jira_instance = get_jira_instance(obj, jira_project=jira_project)
+        if jira_instance:
             logger.debug("getting jira project url3")
             return jira_project.jira_instance.url + "/browse/" + jira_project.project_key
 
@@ -316,7 +382,7 @@ def get_jira_issue_key(obj):
 def get_jira_project_key(obj):
     jira_project = get_jira_project(obj)
 
-    if not get_jira_project:
+    if not jira_project:
         return None
 
     return jira_project.project_key
@@ -335,8 +401,14 @@ def get_jira_issue_template(obj):
         template_dir = "issue-trackers/jira_full/"
 
     if isinstance(obj, Finding_Group):
-        return Path(template_dir) / "jira-finding-group-description.tpl"
-    return Path(template_dir) / "jira-description.tpl"
+        return get_issue_template_path(template_dir, "jira-finding-group-description.tpl")
+    return get_issue_template_path(template_dir, "jira-description.tpl")
+
+
+# only a handful of template dirs exist, no need to build the same path again for every push
+@lru_cache(maxsize=64)
+def get_issue_template_path(template_dir, template_name):
+    return str(Path(template_dir) / template_name)
 
 
 def get_jira_creation(obj):
@@ -398,6 +470,8 @@ def connect_to_jira(jira_server, jira_username, jira_password):
         })
 
 
+# resolved once per process instead of on every connection, see jira_connect_method_changed for tests overriding it
+@lru_cache(maxsize=1)
 def get_jira_connect_method():
     if hasattr(settings, "JIRA_CONNECT_METHOD"):
         try:
@@ -448,22 +522,53 @@ def get_jira_connection(obj):
         jira_instance = get_jira_instance(obj)
 
     if jira_instance is not None:
-        return get_jira_connection_raw(jira_instance.url, jira_instance.username, jira_instance.password)
+        return get_cached_jira_connection(jira_instance.url, jira_instance.username, jira_instance.password)
     return None
 
 
+# reuses the client (and the keep-alive connections of its session) of a previous push to the same jira,
+# instead of logging in again for every issue. get_jira_connection_raw stays uncached for validating credentials.
+def get_cached_jira_connection(jira_server, jira_username, jira_password):
+    connections = getattr(_jira_connections, "clients", None)
+    if connections is None:
+        connections = _jira_connections.clients = {}
+
+    key = (jira_server, jira_username, jira_password)
+    if key in connections:
+        jira, connected_at = connections[key]
+        if time.monotonic() - connected_at < settings.JIRA_CONNECTION_CACHE_TIMEOUT:
+            return jira
+        del connections[key]
+        jira.close()
+
+    jira = get_jira_connection_raw(jira_server, jira_username, jira_password)
+    # after the credentials of a jira instance changed, the clients logged in with the old ones are never used again
+    for stale_key in [other_key for other_key in connections if other_key[0] == jira_server]:
+        connections.pop(stale_key)[0].close()
+    # credentials can expire or be revoked while the client is cached, the next push has to log in again
+    jira._session.hooks["response"].append(partial(discard_rejected_jira_connection, key))
+    connections[key] = (jira, time.monotonic())
+    return jira
+
+
+def discard_rejected_jira_connection(key, response, *args, **kwargs):
+    if response.status_code in {401, 403}:
+        connections = getattr(_jira_connections, "clients", None) or {}
+        # not closed here, the request that got rejected is still being processed by the client
+        connections.pop(key, None)
+
+
+# clients are cached per thread, so this only closes the clients of the thread calling it
+def close_jira_connections():
+    connections = getattr(_jira_connections, "clients", None) or {}
+    while connections:
+        _, (jira, _) = connections.popitem()
+        jira.close()
+
+
 def jira_get_resolution_id(jira, issue, status):
     transitions = jira.transitions(issue)
-    resolution_id = None
-    for t in transitions:
-        if t["name"] == "Resolve Issue":
-            resolution_id = t["id"]
-            break
-        if t["name"] == "Reopen Issue":
-            resolution_id = t["id"]
-            break
-
-    return resolution_id
+    return next((t["id"] for t in transitions if t["name"] in {"Resolve Issue", "Reopen Issue"}), None)
 
 
 def jira_transition(jira, issue, transition_id):
@@ -472,7 +577,7 @@ def jira_transition(jira, issue, transition_id):
             jira.transition_issue(issue, transition_id)
             return True
     except JIRAError as jira_error:
-        logger.debug("error transitioning jira issue " + issue.key + " " + str(jira_error))
+        logger.debug("error transitioning jira issue %s %s", issue.key, jira_error)
         logger.exception("Error with Jira transation issue")
         alert_text = f"JiraError HTTP {jira_error.status_code}"
         if jira_error.url:
@@ -485,6 +590,7 @@ def jira_transition(jira, issue, transition_id):
 
 # Used for unit testing so geting all the connections is manadatory
 def get_jira_updated(finding):
+    j_issue = None
     if finding.has_jira_issue:
         j_issue = finding.jira_issue.jira_id
     elif finding.finding_group and finding.finding_group.has_jira_issue:
@@ -499,6 +605,7 @@ def get_jira_updated(finding):
 
 # Used for unit testing so geting all the connections is manadatory
 def get_jira_status(finding):
+    j_issue = None
     if finding.has_jira_issue:
         j_issue = finding.jira_issue.jira_id
     elif finding.finding_group and finding.finding_group.has_jira_issue:
@@ -513,6 +620,7 @@ def get_jira_status(finding):
 
 # Used for unit testing so geting all the connections is manadatory
 def get_jira_comments(finding):
+    j_issue = None
     if finding.has_jira_issue:
         j_issue = finding.jira_issue.jira_id
     elif finding.finding_group and finding.finding_group.has_jira_issue:
@@ -573,56 +681,57 @@ def log_jira_message(text, finding):
 
 def get_labels(obj):
     # Update Label with system settings label
-    labels = []
+    # dict keeps the insertion order while de-duplicating labels, which can be many for groups with lots of vulnerability ids
+    labels = {}
     system_settings = System_Settings.objects.get()
     system_labels = system_settings.jira_labels
     prod_name_label = prod_name(obj).replace(" ", "_")
     jira_project = get_jira_project(obj)
 
     if system_labels:
-        system_labels = system_labels.split()
-        for system_label in system_labels:
-            labels.append(system_label)
+        labels.update(dict.fromkeys(system_labels.split()))
         # Update the label with the product name (underscore)
-        labels.append(prod_name_label)
+        labels[prod_name_label] = None
 
     # labels per-product/engagement
     if jira_project and jira_project.jira_labels:
-        project_labels = jira_project.jira_labels.split()
-        for project_label in project_labels:
-            labels.append(project_label)
+        labels.update(dict.fromkeys(jira_project.jira_labels.split()))
         # Update the label with the product name (underscore)
-        if prod_name_label not in labels:
-            labels.append(prod_name_label)
+        labels[prod_name_label] = None
 
     if system_settings.add_vulnerability_id_to_jira_label or (jira_project and jira_project.add_vulnerability_id_to_jira_label):
         if isinstance(obj, Finding) and obj.vulnerability_ids:
-            for vul_id in obj.vulnerability_ids:
-                labels.append(vul_id)
+            labels.update(dict.fromkeys(obj.vulnerability_ids))
         elif isinstance(obj, Finding_Group):
             for finding in obj.findings.all():
-                for vul_id in finding.vulnerability_ids:
-                    labels.append(vul_id)
+                labels.update(dict.fromkeys(finding.vulnerability_ids))
 
-    return labels
+    return list(labels)
 
 
 def get_tags(obj):
     # Update Label with system setttings label
-    tags = []
+    tagged_objects = []
     if isinstance(obj, Finding | Engagement):
-        obj_tags = obj.tags.all()
-        if obj_tags:
-            tags.extend(str(tag.name.replace(" ", "-")) for tag in obj_tags)
+        tagged_objects = [obj]
     if isinstance(obj, Finding_Group):
-        for finding in obj.findings.all():
-            obj_tags = finding.tags.all()
-            if obj_tags:
-                for tag in obj_tags:
-                    if tag not in tags:
-                        tags.append(str(tag.name.replace(" ", "-")))
+        tagged_objects = obj.findings.all()
+
+    # dict keeps the insertion order while de-duplicating tags shared by findings of a group
+    tags = dict.fromkeys(str(tag.name.replace(" ", "-")) for tagged_object in tagged_objects for tag in tagged_object.tags.all())
+    return list(tags)
 
-    return tags
+
+def prefetch_jira_issue_relations(obj):
+    # labels, tags, environment, description and attachments all iterate over the endpoints (and the findings
+    # of a group), so load them once instead of querying again on every iteration
+    if isinstance(obj, Finding):
+        prefetch_related_objects([obj], "endpoints")
+    elif isinstance(obj, Finding_Group):
+        prefetch_related_objects(
+            [obj],
+            Prefetch("findings", queryset=Finding.objects.prefetch_related("tags", "endpoints", "vulnerability_id_set", "files")),
+        )
 
 
 def jira_summary(obj):
@@ -656,15 +765,10 @@ def jira_priority(obj):
 
 def jira_environment(obj):
     if isinstance(obj, Finding):
-        return "\n".join([str(endpoint) for endpoint in obj.endpoints.all()])
+        return "\n".join(str(endpoint) for endpoint in obj.endpoints.all())
     if isinstance(obj, Finding_Group):
-        envs = [
-            jira_environment(finding)
-            for finding in obj.findings.all()
-        ]
-
-        jira_environments = [env for env in envs if env]
-        return "\n".join(jira_environments)
+        envs = (jira_environment(finding) for finding in obj.findings.all())
+        return "\n".join(env for env in envs if env)
     return ""
 
 
@@ -688,32 +792,35 @@ def push_to_jira(obj, *args, **kwargs):
 # we need thre separate celery tasks due to the decorators we're using to map to/from ids
 @dojo_model_to_id
 @dojo_async_task
-@app.task
+@app.task(rate_limit=settings.JIRA_PUSH_RATE_LIMIT)
 @dojo_model_from_id
 def push_finding_to_jira(finding, *args, **kwargs):
-    if finding.has_jira_issue:
-        return update_jira_issue(finding, *args, **kwargs)
-    return add_jira_issue(finding, *args, **kwargs)
+    with jira_push_cache():
+        if finding.has_jira_issue:
+            return update_jira_issue(finding, *args, **kwargs)
+        return add_jira_issue(finding, *args, **kwargs)
 
 
 @dojo_model_to_id
 @dojo_async_task
-@app.task
+@app.task(rate_limit=settings.JIRA_PUSH_RATE_LIMIT)
 @dojo_model_from_id(model=Finding_Group)
 def push_finding_group_to_jira(finding_group, *args, **kwargs):
-    if finding_group.has_jira_issue:
-        return update_jira_issue(finding_group, *args, **kwargs)
-    return add_jira_issue(finding_group, *args, **kwargs)
+    with jira_push_cache():
+        if finding_group.has_jira_issue:
+            return update_jira_issue(finding_group, *args, **kwargs)
+        return add_jira_issue(finding_group, *args, **kwargs)
 
 
 @dojo_model_to_id
 @dojo_async_task
-@app.task
+@app.task(rate_limit=settings.JIRA_PUSH_RATE_LIMIT)
 @dojo_model_from_id(model=Engagement)
 def push_engagement_to_jira(engagement, *args, **kwargs):
-    if engagement.has_jira_issue:
-        return update_epic(engagement, *args, **kwargs)
-    return add_epic(engagement, *args, **kwargs)
+    with jira_push_cache():
+        if engagement.has_jira_issue:
+            return update_epic(engagement, *args, **kwargs)
+        return add_epic(engagement, *args, **kwargs)
 
 
 def add_issues_to_epic(jira, obj, epic_id, issue_keys, *, ignore_epics=True):
@@ -731,9 +838,9 @@ def add_issues_to_epic(jira, obj, epic_id, issue_keys, *, ignore_epics=True):
         try:
             if "The request contains a next-gen issue." in str(e):
                 # Attempt to update the issue manually
+                epic = jira.issue(epic_id)
                 for issue_key in issue_keys:
                     issue = jira.issue(issue_key)
-                    epic = jira.issue(epic_id)
                     issue.update(parent={"key": epic.key})
         except JIRAError as e:
             logger.exception("error adding issues %s to epic %s for %s", issue_keys, epic_id, obj.id)
@@ -831,10 +938,9 @@ def add_jira_issue(obj, *args, **kwargs):
     except Exception as e:
         message = f"The following jira instance could not be connected: {jira_instance} - {e}"
         return failure_to_add_message(message, e, obj)
+    prefetch_jira_issue_relations(obj)
     # Set the list of labels to set on the jira issue
-    labels = get_labels(obj) + get_tags(obj)
-    if labels:
-        labels = list(dict.fromkeys(labels))  # de-dup
+    labels = list(dict.fromkeys(chain(get_labels(obj), get_tags(obj))))
     # Determine what due date to set on the jira issue
     duedate = None
 
@@ -842,7 +948,7 @@ def add_jira_issue(obj, *args, **kwargs):
         duedate = obj.sla_deadline()
     # Set the fields that will compose the jira issue
     try:
-        issuetype_fields = get_issuetype_fields(jira, jira_project.project_key, jira_instance.default_issue_type)
+        issuetype_fields = get_cached_issuetype_fields(jira, jira_instance, jira_project.project_key, jira_instance.default_issue_type)
         fields = prepare_jira_issue_fields(
             project_key=jira_project.project_key,
             issuetype_name=jira_instance.default_issue_type,
@@ -870,12 +976,14 @@ def add_jira_issue(obj, *args, **kwargs):
         logger.debug("saving JIRA_Issue for %s finding %s", new_issue.key, obj.id)
         j_issue = JIRA_Issue(jira_id=new_issue.id, jira_key=new_issue.key, jira_project=jira_project)
         j_issue.set_obj(obj)
-        j_issue.jira_creation = timezone.now()
-        j_issue.jira_change = timezone.now()
+        now = timezone.now()
+        j_issue.jira_creation = now
+        j_issue.jira_change = now
         j_issue.save()
-        jira.issue(new_issue.id)
         logger.info("Created the following jira issue for %d:%s", obj.id, to_str_typed(obj))
     except Exception as e:
+        if isinstance(e, JIRAError):
+            evict_issuetype_fields_cache(jira_instance)
         message = f"Failed to create jira issue with the following payload: {fields} - {e}"
         return failure_to_add_message(message, e, obj)
     # Attempt to set a default assignee
@@ -895,14 +1003,18 @@ def add_jira_issue(obj, *args, **kwargs):
         if isinstance(obj, Finding_Group):
             findings = obj.findings.all()
 
+        existing_filenames = None
         for find in findings:
             for pic in get_file_images(find):
+                if existing_filenames is None:
+                    existing_filenames = get_attachment_filenames(new_issue)
                 # It doesn't look like the celery cotainer has anything in the media
                 # folder. Has this feature ever worked?
                 try:
                     jira_attachment(
                         find, jira, new_issue,
-                        settings.MEDIA_ROOT + "/" + pic)
+                        settings.MEDIA_ROOT + "/" + pic,
+                        existing_filenames=existing_filenames)
                 except FileNotFoundError as e:
                     logger.info(e)
     except Exception as e:
@@ -911,10 +1023,10 @@ def add_jira_issue(obj, *args, **kwargs):
         failure_to_add_message(message, e, obj)
     # Add any notes that already exist in the finding to the JIRA
     try:
-        for find in findings:
-            if find.notes.all():
-                for note in find.notes.all().reverse():
-                    add_comment(obj, note)
+        if jira_project.push_notes:
+            for find in findings:
+                for note in find.notes.filter(private=False).select_related("author").reverse():
+                    _add_comment_raw(jira, j_issue, note)
     except Exception as e:
         message = f"Failed to add notes to the jira ticket: {e}"
         # Do not return here as this should be a soft failure that should be logged
@@ -960,24 +1072,24 @@ def update_jira_issue(obj, *args, **kwargs):
     try:
         JIRAError.log_to_tempfile = False
         jira = get_jira_connection(jira_instance)
-        issue = jira.issue(j_issue.jira_id)
+        # only the fields merged into the update are needed, issue.update() reloads the full issue afterwards
+        issue = jira.issue(j_issue.jira_id, fields="components,labels")
     except Exception as e:
         message = f"The following jira instance could not be connected: {jira_instance} - {e}"
         return failure_to_update_message(message, e, obj)
-    # Set the list of labels to set on the jira issue
-    labels = get_labels(obj) + get_tags(obj)
-    if labels:
-        labels = list(dict.fromkeys(labels))  # de-dup
+    prefetch_jira_issue_relations(obj)
+    # Set the list of labels to set on the jira issue, keeping the labels already on it
+    labels = list(dict.fromkeys(chain(get_labels(obj), get_tags(obj), issue.fields.labels or ())))
     # Set the fields that will compose the jira issue
     try:
-        issuetype_fields = get_issuetype_fields(jira, jira_project.project_key, jira_instance.default_issue_type)
+        issuetype_fields = get_cached_issuetype_fields(jira, jira_instance, jira_project.project_key, jira_instance.default_issue_type)
         fields = prepare_jira_issue_fields(
             project_key=jira_project.project_key,
             issuetype_name=jira_instance.default_issue_type,
             summary=jira_summary(obj),
             description=jira_description(obj, finding_text=get_jira_finding_text(jira_instance)),
             component_name=jira_project.component if not issue.fields.components else None,
-            labels=labels + issue.fields.labels,
+            labels=labels,
             environment=jira_environment(obj),
             # Do not update the priority in jira after creation as this could have changed in jira, but should not change in dojo
             # priority_name=jira_priority(obj),
@@ -997,6 +1109,8 @@ def update_jira_issue(obj, *args, **kwargs):
         j_issue.jira_change = timezone.now()
         j_issue.save()
     except Exception as e:
+        if isinstance(e, JIRAError):
+            evict_issuetype_fields_cache(jira_instance)
         message = f"Failed to update the jira issue with the following payload: {fields} - {e}"
         return failure_to_update_message(message, e, obj)
     # Update the status in jira
@@ -1011,14 +1125,18 @@ def update_jira_issue(obj, *args, **kwargs):
         if isinstance(obj, Finding_Group):
             findings = obj.findings.all()
 
+        existing_filenames = None
         for find in findings:
             for pic in get_file_images(find):
+                if existing_filenames is None:
+                    existing_filenames = get_attachment_filenames(issue)
                 # It doesn't look like the celery container has anything in the media
                 # folder. Has this feature ever worked?
                 try:
                     jira_attachment(
                         find, jira, issue,
-                        settings.MEDIA_ROOT + "/" + pic)
+                        settings.MEDIA_ROOT + "/" + pic,
+                        existing_filenames=existing_filenames)
                 except FileNotFoundError as e:
                     logger.info(e)
     except Exception as e:
@@ -1028,7 +1146,7 @@ def update_jira_issue(obj, *args, **kwargs):
     # Determine whether to assign this new jira issue to a mapped epic
     try:
         if jira_project.enable_engagement_epic_mapping:
-            eng = find.test.engagement
+            eng = obj.test.engagement
             logger.debug("Adding to EPIC Map: %s", eng.name)
             epic = get_jira_issue(eng)
             if epic:
@@ -1097,10 +1215,14 @@ def issue_from_jira_is_active(issue_from_jira):
 
 
 def push_status_to_jira(obj, jira_instance, jira, issue, *, save=False):
+    # findings report their status as a comma separated string, groups as a single status
     status_list = _safely_get_finding_group_status(obj)
+    statuses = {status.strip() for status in status_list.split(",")} if status_list else set()
     issue_closed = False
+    # the transitions below are only sent when the status in jira differs, otherwise nothing is pushed
+    updated = False
     # check RESOLVED_STATUS first to avoid corner cases with findings that are Inactive, but verified
-    if any(item in status_list for item in RESOLVED_STATUS):
+    if statuses & RESOLVED_STATUS:
         if issue_from_jira_is_active(issue):
             logger.debug("Transitioning Jira issue to Resolved")
             updated = jira_transition(jira, issue, jira_instance.close_status_key)
@@ -1109,7 +1231,7 @@ def push_status_to_jira(obj, jira_instance, jira, issue, *, save=False):
             updated = False
         issue_closed = True
 
-    if not issue_closed and any(item in status_list for item in OPEN_STATUS):
+    if not issue_closed and statuses & OPEN_STATUS:
         if not issue_from_jira_is_active(issue):
             logger.debug("Transitioning Jira issue to Active (Reopen)")
             updated = jira_transition(jira, issue, jira_instance.open_status_key)
@@ -1193,6 +1315,37 @@ def get_issuetype_fields(
     return issuetype_fields
 
 
+def get_issuetype_fields_cache_key(jira_instance_id):
+    return f"jira_issuetype_fields_{jira_instance_id}"
+
+
+def invalidate_issuetype_fields_cache(jira_instance_id):
+    cache.delete(get_issuetype_fields_cache_key(jira_instance_id))
+
+
+def evict_issuetype_fields_cache(jira_instance):
+    # jira rejecting the fields we sent may mean the fields of the issue type changed since they were cached
+    logger.debug("evicting cached issue type fields of jira instance %s", jira_instance)
+    invalidate_issuetype_fields_cache(jira_instance.id)
+
+
+# same as get_issuetype_fields, but remembers the result per jira instance as the metadata hardly ever changes
+# and fetching it is an extra call to jira for every push. see dojo.jira_link.signals for invalidation on save
+def get_cached_issuetype_fields(jira, jira_instance, project_key, issuetype_name):
+    if not settings.JIRA_ISSUETYPE_FIELDS_CACHE_TIMEOUT:
+        return list(get_issuetype_fields(jira, project_key, issuetype_name))
+
+    cache_key = get_issuetype_fields_cache_key(jira_instance.id)
+    issuetype_fields_by_type = cache.get(cache_key, {})
+
+    if (project_key, issuetype_name) not in issuetype_fields_by_type:
+        # errors are raised by get_issuetype_fields, so only valid metadata ends up in the cache
+        issuetype_fields_by_type[project_key, issuetype_name] = list(get_issuetype_fields(jira, project_key, issuetype_name))
+        cache.set(cache_key, issuetype_fields_by_type, settings.JIRA_ISSUETYPE_FIELDS_CACHE_TIMEOUT)
+
+    return issuetype_fields_by_type[project_key, issuetype_name]
+
+
 def is_jira_project_valid(jira_project):
     try:
         jira = get_jira_connection(jira_project)
@@ -1203,35 +1356,42 @@ def is_jira_project_valid(jira_project):
     return True
 
 
-def jira_attachment(finding, jira, issue, file, jira_filename=None):
-    basename = file
-    if jira_filename is None:
-        basename = Path(file).name
+# existing_filenames can be passed in when attaching several files to the same issue, to avoid scanning
+# the attachments of the issue for every file. files uploaded here are added to it.
+# jira_filename uploads the file under another name than its own
+def jira_attachment(finding, jira, issue, file, jira_filename=None, existing_filenames=None):
+    basename = jira_filename if jira_filename is not None else Path(file).name
 
     # Check to see if the file has been uploaded to Jira
     # TODO: JIRA: check for local existince of attachment as it currently crashes if local attachment doesn't exist
-    if jira_check_attachment(issue, basename) is False:
+    if existing_filenames is not None:
+        file_exists = basename in existing_filenames
+    else:
+        file_exists = jira_check_attachment(issue, basename)
+
+    if file_exists is False:
         try:
-            if jira_filename is not None:
-                attachment = io.StringIO()
-                attachment.write(jira_filename)
-                jira.add_attachment(
-                    issue=issue, attachment=attachment, filename=jira_filename)
-            else:
-                # read and upload a file
-                with Path(file).open("rb") as f:
-                    jira.add_attachment(issue=issue, attachment=f)
+            # read and upload a file
+            with Path(file).open("rb") as f:
+                jira.add_attachment(issue=issue, attachment=f, filename=jira_filename)
         except JIRAError as e:
             logger.exception("Unable to add attachment")
             log_jira_alert("Attachment: " + e.text, finding)
             return False
+        if existing_filenames is not None:
+            existing_filenames.add(basename)
         return True
     return None
 
 
+def get_attachment_filenames(issue):
+    # jira leaves out the attachment field when it's not on the screen of the issue
+    return {attachment.filename for attachment in getattr(issue.fields, "attachment", None) or []}
+
+
 def jira_check_attachment(issue, source_file_name):
     file_exists = False
-    for attachment in issue.fields.attachment:
+    for attachment in getattr(issue.fields, "attachment", None) or []:
         filename = attachment.filename
 
         if filename == source_file_name:
@@ -1263,18 +1423,8 @@ def close_epic(eng, push_to_jira, **kwargs):
                     logger.warning("JIRA close epic failed: no issue found")
                     return False
 
-                req_url = jira_instance.url + "/rest/api/latest/issue/" + \
-                    jissue.jira_id + "/transitions"
-                json_data = {"transition": {"id": jira_instance.close_status_key}}
-                r = requests.post(
-                    url=req_url,
-                    auth=HTTPBasicAuth(jira_instance.username, jira_instance.password),
-                    json=json_data,
-                    timeout=settings.REQUESTS_TIMEOUT,
-                )
-                if r.status_code != 204:
-                    logger.warning(f"JIRA close epic failed with error: {r.text}")
-                    return False
+                jira = get_jira_connection(jira_instance)
+                jira.transition_issue(jissue.jira_id, jira_instance.close_status_key)
             except JIRAError as e:
                 logger.exception("Jira Engagement/Epic Close Error")
                 log_jira_generic_alert("Jira Engagement/Epic Close Error", str(e))
@@ -1361,7 +1511,7 @@ def add_epic(engagement, **kwargs):
         try:
             jira = get_jira_connection(jira_instance)
             # Determine if we should add the epic name or not
-            if (epic_name_field := get_epic_name_field_name(jira_instance)) in get_issuetype_fields(jira, jira_project.project_key, epic_issue_type_name):
+            if (epic_name_field := get_epic_name_field_name(jira_instance)) in get_cached_issuetype_fields(jira, jira_instance, jira_project.project_key, epic_issue_type_name):
                 issue_dict[epic_name_field] = epic_name
             logger.debug("add_epic: %s", issue_dict)
             new_issue = jira.create_issue(fields=issue_dict)
@@ -1372,6 +1522,7 @@ def add_epic(engagement, **kwargs):
                 jira_project=jira_project)
             j_issue.save()
         except JIRAError as e:
+            evict_issuetype_fields_cache(jira_instance)
             # should we try to parse the errors as JIRA is very strange in how it responds.
             # for example a non existent project_key leads to "project key is required" which sounds like something is missing
             # but it's just a non-existent project (or maybe a project for which the account has no create permission?)
@@ -1422,20 +1573,24 @@ def add_comment(obj, note, *, force_push=False, **kwargs):
         jira_instance = get_jira_instance(obj)
 
         if jira_project.push_notes or force_push is True:
-            try:
-                jira = get_jira_connection(jira_instance)
-                j_issue = obj.jira_issue
-                jira.add_comment(
-                    j_issue.jira_id,
-                    f"({note.author.get_full_name() or note.author.username}): {note.entry}")
-            except JIRAError as e:
-                log_jira_generic_alert("Jira Add Comment Error", str(e))
-                return False
-            return True
+            jira = get_jira_connection(jira_instance)
+            return _add_comment_raw(jira, obj.jira_issue, note)
         return None
     return None
 
 
+def _add_comment_raw(jira, j_issue, note):
+    # callers are responsible for the jira configuration and note visibility checks
+    try:
+        jira.add_comment(
+            j_issue.jira_id,
+            f"({note.author.get_full_name() or note.author.username}): {note.entry}")
+    except JIRAError as e:
+        log_jira_generic_alert("Jira Add Comment Error", str(e))
+        return False
+    return True
+
+
 def add_simple_jira_comment(jira_instance, jira_issue, comment):
     try:
         jira_project = get_jira_project(jira_issue)
@@ -1487,8 +1642,9 @@ def finding_link_jira(request, finding, new_jira_issue_key):
     # jira timestampe are in iso format: 'updated': '2020-07-17T09:49:51.447+0200'
     # seems to be a pain to parse these in python < 3.7, so for now just record the curent time as
     # as the timestamp the jira link was created / updated in DD
-    jira_issue.jira_creation = timezone.now()
-    jira_issue.jira_change = timezone.now()
+    now = timezone.now()
+    jira_issue.jira_creation = now
+    jira_issue.jira_change = now
 
     jira_issue.save()
 
@@ -1521,8 +1677,9 @@ def finding_group_link_jira(request, finding_group, new_jira_issue_key):
     # jira timestampe are in iso format: 'updated': '2020-07-17T09:49:51.447+0200'
     # seems to be a pain to parse these in python < 3.7, so for now just record the curent time as
     # as the timestamp the jira link was created / updated in DD
-    jira_issue.jira_creation = timezone.now()
-    jira_issue.jira_change = timezone.now()
+    now = timezone.now()
+    jira_issue.jira_creation = now
+    jira_issue.jira_change = now
 
     jira_issue.save()
 
@@ -1543,7 +1700,7 @@ def unlink_jira(request, obj):
 
 # return True if no errors
 def process_jira_project_form(request, instance=None, target=None, product=None, engagement=None):
-    if not get_system_setting("enable_jira"):
+    if not is_jira_enabled():
         return True, None
 
     error = False
@@ -1552,7 +1709,7 @@ def process_jira_project_form(request, instance=None, target=None, product=None,
     # jform = JIRAProjectForm(request.POST, instance=instance if instance else JIRA_Project(), product=product)
     jform = JIRAProjectForm(request.POST, instance=instance, target=target, product=product, engagement=engagement)
     # logging has_changed because it sometimes doesn't do what we expect
-    logger.debug("jform has changed: %s", str(jform.has_changed()))
+    logger.debug("jform has changed: %s", jform.has_changed())
 
     if jform.has_changed():  # if no data was changed, no need to do anything!
         logger.debug("jform changed_data: %s", jform.changed_data)
@@ -1624,7 +1781,7 @@ def process_jira_project_form(request, instance=None, target=None, product=None,
 
 # return True if no errors
 def process_jira_epic_form(request, engagement=None):
-    if not get_system_setting("enable_jira"):
+    if not is_jira_enabled():
         return True, None
 
     logger.debug("checking jira epic form for engagement: %i:%s", engagement.id if engagement else 0, engagement)
@@ -1666,24 +1823,38 @@ def process_jira_epic_form(request, engagement=None):
     return not error, jira_epic_form
 
 
+JIRA_ESCAPE_TABLE = str.maketrans({"|": "%7C"})
+
+
 # some character will mess with JIRA formatting, for example when constructing a link:
 # [name|url]. if name contains a '|' is will break it
 # so [%s|%s] % (escape_for_jira(name), url)
 def escape_for_jira(text):
-    return text.replace("|", "%7D")
+    return text.translate(JIRA_ESCAPE_TABLE)
+
+
+# relations process_resolution_from_jira walks through for every finding it updates
+RESOLUTION_SELECT_RELATED = ("reporter", *(f"test__{related}" for related in JIRA_PROJECT_SELECT_RELATED))
+
+
+@cache_for_request
+def get_jira_user():
+    """Returns the user changes coming from jira are attributed to"""
+    return User.objects.get_or_create(username="JIRA")[0]
 
 
 def process_resolution_from_jira(finding, resolution_id, resolution_name, assignee_name, jira_now, jira_issue, finding_group: Finding_Group = None) -> bool:
     """Processes the resolution field in the JIRA issue and updated the finding in Defect Dojo accordingly"""
     import dojo.risk_acceptance.helper as ra_helper
     status_changed = False
+    finding_saved = False
     resolved = resolution_id is not None
     jira_instance = get_jira_instance(finding)
 
     if resolved:
         if jira_instance and resolution_name in jira_instance.accepted_resolutions and (finding.test.engagement.product.enable_simple_risk_acceptance or finding.test.engagement.enable_full_risk_acceptance):
             if not finding.risk_accepted:
-                logger.debug(f"Marking related finding of {jira_issue.jira_key} as accepted.")
+                logger.debug("Marking related finding of %s as accepted.", jira_issue.jira_key)
                 finding.risk_accepted = True
                 finding.active = False
                 finding.mitigated = None
@@ -1691,50 +1862,59 @@ def process_resolution_from_jira(finding, resolution_id, resolution_name, assign
                 finding.false_p = False
 
                 if finding.test.engagement.product.enable_full_risk_acceptance:
-                    logger.debug(f"Creating risk acceptance for finding linked to {jira_issue.jira_key}.")
+                    logger.debug("Creating risk acceptance for finding linked to %s.", jira_issue.jira_key)
                     ra = Risk_Acceptance.objects.create(
                         accepted_by=assignee_name,
                         owner=finding.reporter,
                         decision_details=f"Risk Acceptance automatically created from JIRA issue {jira_issue.jira_key} with resolution {resolution_name}",
                     )
                     finding.test.engagement.risk_acceptance.add(ra)
-                    ra_helper.add_findings_to_risk_acceptance(User.objects.get_or_create(username="JIRA")[0], ra, [finding])
+                    ra_helper.add_findings_to_risk_acceptance(get_jira_user(), ra, [finding])
                 status_changed = True
         elif jira_instance and resolution_name in jira_instance.false_positive_resolutions:
             if not finding.false_p:
-                logger.debug(f"Marking related finding of {jira_issue.jira_key} as false-positive")
+                logger.debug("Marking related finding of %s as false-positive", jira_issue.jira_key)
                 finding.active = False
                 finding.verified = False
                 finding.mitigated = None
                 finding.is_mitigated = False
                 finding.false_p = True
-                ra_helper.risk_unaccept(User.objects.get_or_create(username="JIRA")[0], finding)
+                ra_helper.risk_unaccept(get_jira_user(), finding)
                 status_changed = True
         # Mitigated by default as before
         elif not finding.is_mitigated:
-            logger.debug(f"Marking related finding of {jira_issue.jira_key} as mitigated (default)")
+            logger.debug("Marking related finding of %s as mitigated (default)", jira_issue.jira_key)
             finding.active = False
             finding.mitigated = jira_now
             finding.is_mitigated = True
-            finding.mitigated_by, _created = User.objects.get_or_create(username="JIRA")
-            finding.endpoints.clear()
+            jira_user = get_jira_user()
+            finding.mitigated_by = jira_user
             finding.false_p = False
-            ra_helper.risk_unaccept(User.objects.get_or_create(username="JIRA")[0], finding)
+            # remove the endpoints and record the mitigation in one transaction. risk_unaccept can push
+            # the finding to jira, so it only runs once both are committed
+            with transaction.atomic():
+                # most code findings have no endpoints, don't issue a delete for those
+                if finding.endpoints.exists():
+                    finding.endpoints.clear()
+                finding.save()
+            finding_saved = True
+            ra_helper.risk_unaccept(jira_user, finding)
             status_changed = True
     elif not finding.active and (finding_group is None or settings.JIRA_WEBHOOK_ALLOW_FINDING_GROUP_REOPEN):
         # Reopen / Open Jira issue
-        logger.debug(f"Re-opening related finding of {jira_issue.jira_key}")
+        logger.debug("Re-opening related finding of %s", jira_issue.jira_key)
         finding.active = True
         finding.mitigated = None
         finding.is_mitigated = False
         finding.false_p = False
-        ra_helper.risk_unaccept(User.objects.get_or_create(username="JIRA")[0], finding)
+        ra_helper.risk_unaccept(get_jira_user(), finding)
         status_changed = True
 
     # for findings in a group, there is no jira_issue attached to the finding
+    # only the timestamp changes, so write just that column
+    JIRA_Issue.objects.filter(pk=jira_issue.pk).update(jira_change=jira_now)
     jira_issue.jira_change = jira_now
-    jira_issue.save()
-    if status_changed:
+    if status_changed and not finding_saved:
         finding.save()
     return status_changed
 
@@ -1742,18 +1922,24 @@ def process_resolution_from_jira(finding, resolution_id, resolution_name, assign
 def save_and_push_to_jira(finding):
     # Manage the jira status changes
     push_to_jira_decision = False
-    # Determine if the finding is in a group. if so, not push to jira yet
-    finding_in_group = finding.has_finding_group
-    # Check if there is a jira issue that needs to be updated
-    jira_issue_exists = finding.has_jira_issue or (finding.finding_group and finding.finding_group.has_jira_issue)
+    finding_in_group = False
+    # Check if there is a jira issue that needs to be updated, skipping the lookups when jira is disabled
+    jira_issue_exists = False
+    if is_jira_enabled():
+        finding_group = finding.finding_group
+        # Determine if the finding is in a group. if so, not push to jira yet
+        finding_in_group = finding_group is not None
+        jira_issue_exists = finding.has_jira_issue or (finding_in_group and finding_group.has_jira_issue)
     # Only push if the finding is not in a group
     if jira_issue_exists:
-        # Determine if any automatic sync should occur
-        push_to_jira_decision = is_push_all_issues(finding) \
-            or get_jira_instance(finding).finding_jira_sync
+        # Determine if any automatic sync should occur, looking up the jira project of the finding only once
+        with jira_push_cache():
+            jira_instance = get_jira_instance(finding)
+            push_to_jira_decision = is_push_all_issues(finding) \
+                or (jira_instance is not None and jira_instance.finding_jira_sync)
     # Save the finding
     finding.save(push_to_jira=(push_to_jira_decision and not finding_in_group))
     # we only push the group after saving the finding to make sure
     # the updated data of the finding is pushed as part of the group
     if push_to_jira_decision and finding_in_group:
-        push_to_jira(finding.finding_group)
+        push_to_jira(finding_group)
@@ -0,0 +1,32 @@
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from dojo.models import JIRA_Instance, JIRA_Project
+
+
+@receiver(post_save, sender=JIRA_Instance)
+@receiver(post_delete, sender=JIRA_Instance)
+def jira_instance_clear_cache(sender, instance, **kwargs):
+    # avoid loading the forms imported by the jira helper while the apps are being initialized
+    import dojo.jira_link.helper as jira_helper
+
+    # url or credentials may point to a different jira now, so the cached metadata can't be trusted anymore
+    jira_helper.invalidate_issuetype_fields_cache(instance.id)
+
+
+@receiver(post_save, sender=JIRA_Project)
+def jira_project_clear_cache(sender, instance, **kwargs):
+    import dojo.jira_link.helper as jira_helper
+
+    # saving the jira project configuration is the way for users to pick up fields changed in jira
+    if instance.jira_instance_id is not None:
+        jira_helper.invalidate_issuetype_fields_cache(instance.jira_instance_id)
+
+
+@receiver(setting_changed)
+def jira_connect_method_changed(sender, setting, **kwargs):
+    if setting == "JIRA_CONNECT_METHOD":
+        import dojo.jira_link.helper as jira_helper
+
+        jira_helper.get_jira_connect_method.cache_clear()
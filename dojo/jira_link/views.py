@@ -25,7 +25,7 @@ from dojo.authorization.authorization import user_has_configuration_permission
 
 # Local application/library imports
 from dojo.forms import AdvancedJIRAForm, DeleteJIRAInstanceForm, JIRAForm
-from dojo.models import JIRA_Instance, JIRA_Issue, Notes, System_Settings, User
+from dojo.models import JIRA_Instance, JIRA_Issue, Notes, System_Settings
 from dojo.notifications.helper import create_notification
 from dojo.utils import add_breadcrumb, add_error_message_to_response, get_setting
 
@@ -96,17 +96,20 @@ def webhook(request, secret=None):
             jid = parsed["issue"]["id"]
             # This may raise a 404, but it will be handled in the exception response
             try:
-                jissue = JIRA_Issue.objects.get(jira_id=jid)
+                jissue = JIRA_Issue.objects.select_related(
+                    "finding_group",
+                    *(f"finding__{related}" for related in jira_helper.RESOLUTION_SELECT_RELATED),
+                ).get(jira_id=jid)
             except JIRA_Instance.DoesNotExist:
                 return webhook_responser_handler("info", f"JIRA issue {jid} is not linked to a DefectDojo Finding")
             findings = None
             # Determine what type of object we will be working with
             if jissue.finding:
-                logger.debug(f"Received issue update for {jissue.jira_key} for finding {jissue.finding.id}")
+                logger.debug("Received issue update for %s for finding %s", jissue.jira_key, jissue.finding.id)
                 findings = [jissue.finding]
             elif jissue.finding_group:
-                logger.debug(f"Received issue update for {jissue.jira_key} for finding group {jissue.finding_group}")
-                findings = jissue.finding_group.findings.all()
+                logger.debug("Received issue update for %s for finding group %s", jissue.jira_key, jissue.finding_group)
+                findings = jissue.finding_group.findings.select_related(*jira_helper.RESOLUTION_SELECT_RELATED)
             elif jissue.engagement:
                 return webhook_responser_handler("debug", "Update for engagement ignored")
             else:
@@ -138,8 +141,10 @@ def webhook(request, secret=None):
             jira_now = parse_datetime(parsed["issue"]["fields"]["updated"])
 
             if findings:
-                for finding in findings:
-                    jira_helper.process_resolution_from_jira(finding, resolution_id, resolution_name, assignee_name, jira_now, jissue, finding_group=jissue.finding_group)
+                # the findings of a group share their test, so the jira configuration is looked up only once
+                with jira_helper.jira_push_cache():
+                    for finding in findings:
+                        jira_helper.process_resolution_from_jira(finding, resolution_id, resolution_name, assignee_name, jira_now, jissue, finding_group=jissue.finding_group)
             # Check for any comment that could have come along with the resolution
             if (error_response := check_for_and_create_comment(parsed)) is not None:
                 return error_response
@@ -230,7 +235,7 @@ def check_for_and_create_comment(parsed_json):
         jissue = JIRA_Issue.objects.get(jira_id=jid)
     except JIRA_Instance.DoesNotExist:
         return webhook_responser_handler("info", f"JIRA issue {jid} is not linked to a DefectDojo Finding")
-    logger.debug(f"Received issue comment for {jissue.jira_key}")
+    logger.debug("Received issue comment for %s", jissue.jira_key)
     logger.debug("jissue: %s", vars(jissue))
 
     jira_usernames = JIRA_Instance.objects.values_list("username", flat=True)
@@ -253,7 +258,7 @@ def check_for_and_create_comment(parsed_json):
     else:
         return webhook_responser_handler("info", f"Received issue update for {jissue.jira_key} for unknown object")
     # Set the fields for the notes
-    author, _ = User.objects.get_or_create(username="JIRA")
+    author = jira_helper.get_jira_user()
     entry = f"({commenter_display_name} ({commenter})): {comment_text}"
     # Iterate (potentially) over each of the findings the note should be added to
     for finding in findings:
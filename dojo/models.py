@@ -3881,13 +3881,13 @@ class JIRA_Instance(models.Model):
     def __str__(self):
         return self.configuration_name + " | " + self.url + " | " + self.username
 
-    @property
+    @cached_property
     def accepted_resolutions(self):
-        return [m.strip() for m in (self.accepted_mapping_resolution or "").split(",")]
+        return frozenset(m.strip() for m in (self.accepted_mapping_resolution or "").split(","))
 
-    @property
+    @cached_property
     def false_positive_resolutions(self):
-        return [m.strip() for m in (self.false_positive_mapping_resolution or "").split(",")]
+        return frozenset(m.strip() for m in (self.false_positive_mapping_resolution or "").split(","))
 
     def get_priority(self, status):
         if status == "Info":
@@ -1,3 +1,5 @@
+from functools import wraps
+
 from crum import get_current_request
 
 # Attribution: This code has been taken from https://github.com/anexia-it/django-request-cache, which has
@@ -58,3 +60,30 @@ def cache_for_request(fn):
 
         return result
     return wrapper
+
+
+def cache_model_for_request(fn):
+    """
+    Decorator like cache_for_request, for functions taking a model instance as first argument
+    The instance is identified by its model and primary key, as its string representation is not unique
+    Unsaved instances are not cached
+    :param fn:
+    :return:
+    """
+    @wraps(fn)
+    def wrapper(obj, *args, **kwargs):
+        cache = get_request_cache()
+
+        if not cache or getattr(obj, "pk", None) is None:
+            return fn(obj, *args, **kwargs)
+
+        key = cache_calculate_key(fn.__name__, type(obj).__name__, obj.pk, *args, **kwargs)
+
+        try:
+            result = getattr(cache, key)
+        except AttributeError:
+            result = fn(obj, *args, **kwargs)
+            setattr(cache, key, result)
+
+        return result
+    return wrapper
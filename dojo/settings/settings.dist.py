@@ -231,6 +231,16 @@ env = environ.FileAwareEnv(
     DD_JIRA_WEBHOOK_ALLOW_FINDING_GROUP_REOPEN=(bool, False),
     # You can set extra Jira issue types via a simple env var that supports a csv format, like "Work Item,Vulnerability"
     DD_JIRA_EXTRA_ISSUE_TYPES=(str, ""),
+    # Number of seconds the fields available for a Jira issue type are cached, to avoid fetching them on every push.
+    # Disabled by default. Saving the Jira instance or project configuration clears the cache, but only in the processes
+    # sharing the cache backend, so only enable it once CACHES points to a backend shared with the celery workers.
+    DD_JIRA_ISSUETYPE_FIELDS_CACHE_TIMEOUT=(int, 0),
+    # Number of seconds an authenticated Jira connection is reused for subsequent pushes to the same Jira instance.
+    # Set to 0 to log in to Jira for every push.
+    DD_JIRA_CONNECTION_CACHE_TIMEOUT=(int, 300),
+    # Celery rate limit for the tasks pushing findings, finding groups and engagements to Jira, like "10/s" or "100/m".
+    # Applies to each worker, so bulk updates don't flood the Jira server. Leave empty to push without limit.
+    DD_JIRA_PUSH_RATE_LIMIT=(str, ""),
     # if you want to keep logging to the console but in json format, change this here to 'json_console'
     DD_LOGGING_HANDLER=(str, "console"),
     # If true, drf-spectacular will load CSS & JS from default CDN, otherwise from static resources
@@ -1644,6 +1654,9 @@ if env("DD_JIRA_EXTRA_ISSUE_TYPES") != "":
 
 JIRA_SSL_VERIFY = env("DD_JIRA_SSL_VERIFY")
 JIRA_WEBHOOK_ALLOW_FINDING_GROUP_REOPEN = env("DD_JIRA_WEBHOOK_ALLOW_FINDING_GROUP_REOPEN")
+JIRA_ISSUETYPE_FIELDS_CACHE_TIMEOUT = env("DD_JIRA_ISSUETYPE_FIELDS_CACHE_TIMEOUT")
+JIRA_CONNECTION_CACHE_TIMEOUT = env("DD_JIRA_CONNECTION_CACHE_TIMEOUT")
+JIRA_PUSH_RATE_LIMIT = env("DD_JIRA_PUSH_RATE_LIMIT") or None
 
 # ------------------------------------------------------------------------------
 # LOGGING
@@ -26,6 +26,7 @@ from django.utils.translation import gettext as _
 import dojo.jira_link.helper as jira_helper
 import dojo.utils
 from dojo.models import Benchmark_Product, Check_List, Dojo_User, FileAccessToken, Finding, Product, System_Settings
+from dojo.request_cache import cache_model_for_request
 from dojo.utils import get_file_images, get_full_url, get_system_setting, prepare_for_view
 
 logger = logging.getLogger(__name__)
@@ -840,22 +841,28 @@ def jiraencode_component(value):
     return value.replace("|", "").replace(":", " : ").replace("@", " @ ").replace("?", " ? ").replace("#", " # ")
 
 
+# list pages render the jira filters for every row, and several times for the same finding group,
+# so they are only looked up once per object and request
 @register.filter
+@cache_model_for_request
 def jira_project(obj, *, use_inheritance=True):
     return jira_helper.get_jira_project(obj, use_inheritance=use_inheritance)
 
 
 @register.filter
+@cache_model_for_request
 def jira_issue_url(obj):
     return jira_helper.get_jira_url(obj)
 
 
 @register.filter
+@cache_model_for_request
 def jira_project_url(obj):
     return jira_helper.get_jira_project_url(obj)
 
 
 @register.filter
+@cache_model_for_request
 def jira_key(obj):
     return jira_helper.get_jira_key(obj)
 
@@ -6,6 +6,7 @@ from itertools import chain
 from pathlib import Path
 from pprint import pformat
 
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from django.utils import timezone
@@ -459,6 +460,15 @@ class DojoTestCase(TestCase, DojoTestUtilsMixin):
     def __init__(self, *args, **kwargs):
         TestCase.__init__(self, *args, **kwargs)
 
+    # jira clients are cached per thread, don't let a (mocked) client of one test be used by the next one
+    def setUp(self):
+        super().setUp()
+        jira_helper.close_jira_connections()
+
+    def tearDown(self):
+        jira_helper.close_jira_connections()
+        super().tearDown()
+
     def common_check_finding(self, finding):
         self.assertIn(finding.severity, SEVERITIES)
         finding.clean()
@@ -469,6 +479,14 @@ class DojoAPITestCase(APITestCase, DojoTestUtilsMixin):
     def __init__(self, *args, **kwargs):
         APITestCase.__init__(self, *args, **kwargs)
 
+    def setUp(self):
+        super().setUp()
+        jira_helper.close_jira_connections()
+
+    def tearDown(self):
+        jira_helper.close_jira_connections()
+        super().tearDown()
+
     def login_as_admin(self):
         testuser = self.get_test_admin()
         token = Token.objects.get(user=testuser)
@@ -790,6 +808,11 @@ class DojoVCRTestCase(DojoTestCase, VCRTestCase):
         DojoTestCase.__init__(self, *args, **kwargs)
         VCRTestCase.__init__(self, *args, **kwargs)
 
+    def setUp(self):
+        super().setUp()
+        # jira metadata cached by a previous test would skip requests recorded in the cassette
+        cache.clear()
+
     # filters headers doesn't seem to work for cookies, so use callbacks to filter cookies from being recorded
     # https://github.com/kevin1024/vcrpy/issues/569
     def before_record_request(self, request):
@@ -0,0 +1,379 @@
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from jira.exceptions import JIRAError
+
+from dojo.jira_link import helper as jira_helper
+from dojo.models import Dojo_User, Engagement, Finding, Finding_Group, JIRA_Instance, JIRA_Issue, JIRA_Project, Product
+
+from .dojo_test_case import DojoTestCase
+
+
+class JIRAHelperTest(DojoTestCase):
+
+    def test_escape_for_jira_encodes_pipe(self):
+        self.assertEqual(jira_helper.escape_for_jira("accepted|risk"), "accepted%7Crisk")
+
+    def test_escape_for_jira_keeps_text_without_pipe(self):
+        self.assertEqual(jira_helper.escape_for_jira("accepted risk"), "accepted risk")
+
+    def test_get_attachment_filenames(self):
+        issue = SimpleNamespace(fields=SimpleNamespace(attachment=[SimpleNamespace(filename="a.png"), SimpleNamespace(filename="b.png")]))
+        self.assertEqual(jira_helper.get_attachment_filenames(issue), {"a.png", "b.png"})
+
+    def test_jira_attachment_with_jira_filename(self):
+        jira = MagicMock()
+        issue = SimpleNamespace(fields=SimpleNamespace(attachment=[]))
+        existing_filenames = set()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file = Path(tmp_dir) / "screenshot.png"
+            file.write_bytes(b"image content")
+            uploaded = []
+
+            def add_attachment(issue, attachment, filename):
+                uploaded.append((attachment.read(), filename))
+
+            jira.add_attachment.side_effect = add_attachment
+
+            self.assertTrue(jira_helper.jira_attachment(None, jira, issue, str(file), jira_filename="renamed.png", existing_filenames=existing_filenames))
+            self.assertEqual(uploaded, [(b"image content", "renamed.png")])
+            self.assertEqual(existing_filenames, {"renamed.png"})
+
+            # already uploaded under that name, so not uploaded again
+            self.assertIsNone(jira_helper.jira_attachment(None, jira, issue, str(file), jira_filename="renamed.png", existing_filenames=existing_filenames))
+            jira.add_attachment.assert_called_once()
+
+    def test_get_attachment_filenames_without_attachment_field(self):
+        issue = SimpleNamespace(fields=SimpleNamespace())
+        self.assertEqual(jira_helper.get_attachment_filenames(issue), set())
+
+
+@override_settings(JIRA_ISSUETYPE_FIELDS_CACHE_TIMEOUT=3600)
+class JIRAIssuetypeFieldsCacheTest(DojoTestCase):
+    fixtures = ["dojo_testdata.json"]
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.jira_instance = JIRA_Instance.objects.get(id=2)
+
+    @patch("dojo.jira_link.helper.get_issuetype_fields", return_value=["summary", "description"])
+    def test_get_cached_issuetype_fields_fetches_once(self, get_issuetype_fields_mock):
+        jira = MagicMock()
+        for _ in range(2):
+            fields = jira_helper.get_cached_issuetype_fields(jira, self.jira_instance, "NTEST", "Bug")
+            self.assertEqual(fields, ["summary", "description"])
+        get_issuetype_fields_mock.assert_called_once_with(jira, "NTEST", "Bug")
+
+    @override_settings(JIRA_ISSUETYPE_FIELDS_CACHE_TIMEOUT=0)
+    @patch("dojo.jira_link.helper.get_issuetype_fields", return_value=["summary"])
+    def test_get_cached_issuetype_fields_disabled(self, get_issuetype_fields_mock):
+        jira = MagicMock()
+        for _ in range(2):
+            jira_helper.get_cached_issuetype_fields(jira, self.jira_instance, "NTEST", "Bug")
+        self.assertEqual(get_issuetype_fields_mock.call_count, 2)
+        self.assertIsNone(cache.get(jira_helper.get_issuetype_fields_cache_key(self.jira_instance.id)))
+
+    @patch("dojo.jira_link.helper.get_issuetype_fields", return_value=["summary"])
+    def test_evict_issuetype_fields_cache_refetches(self, get_issuetype_fields_mock):
+        jira = MagicMock()
+        jira_helper.get_cached_issuetype_fields(jira, self.jira_instance, "NTEST", "Bug")
+        jira_helper.evict_issuetype_fields_cache(self.jira_instance)
+        jira_helper.get_cached_issuetype_fields(jira, self.jira_instance, "NTEST", "Bug")
+        self.assertEqual(get_issuetype_fields_mock.call_count, 2)
+
+    def test_saving_jira_instance_clears_cache(self):
+        cache_key = jira_helper.get_issuetype_fields_cache_key(self.jira_instance.id)
+        cache.set(cache_key, {("NTEST", "Bug"): ["summary"]})
+        self.jira_instance.save()
+        self.assertIsNone(cache.get(cache_key))
+
+    def test_saving_jira_project_clears_cache_of_its_instance(self):
+        jira_project = JIRA_Project.objects.get(id=1)
+        cache_key = jira_helper.get_issuetype_fields_cache_key(jira_project.jira_instance_id)
+        cache.set(cache_key, {("NTEST", "Bug"): ["summary"]})
+        jira_project.save()
+        self.assertIsNone(cache.get(cache_key))
+
+
+def mock_jira_client(*args, **kwargs):
+    jira = MagicMock()
+    jira._session.hooks = {"response": []}
+    return jira
+
+
+@patch("dojo.jira_link.helper.get_jira_connection_raw", side_effect=mock_jira_client)
+class JIRAConnectionCacheTest(DojoTestCase):
+
+    def get_connection(self):
+        return jira_helper.get_cached_jira_connection("https://jira.example.com", "user", "secret")
+
+    @override_settings(JIRA_CONNECTION_CACHE_TIMEOUT=300)
+    def test_connection_is_reused(self, connect_mock):
+        jira = self.get_connection()
+        self.assertIs(self.get_connection(), jira)
+        connect_mock.assert_called_once_with("https://jira.example.com", "user", "secret")
+
+    @override_settings(JIRA_CONNECTION_CACHE_TIMEOUT=300)
+    def test_connection_per_credentials(self, connect_mock):
+        jira = self.get_connection()
+        other = jira_helper.get_cached_jira_connection("https://jira.example.com", "other", "secret")
+        self.assertIsNot(other, jira)
+        self.assertEqual(connect_mock.call_count, 2)
+        # the client logged in with the previous credentials is dropped
+        jira.close.assert_called_once_with()
+        self.assertIs(jira_helper.get_cached_jira_connection("https://jira.example.com", "other", "secret"), other)
+        self.assertEqual(connect_mock.call_count, 2)
+
+    @override_settings(JIRA_CONNECTION_CACHE_TIMEOUT=300)
+    def test_connection_per_jira_server(self, connect_mock):
+        jira = self.get_connection()
+        other = jira_helper.get_cached_jira_connection("https://other-jira.example.com", "user", "secret")
+        self.assertIsNot(other, jira)
+        self.assertIs(self.get_connection(), jira)
+        jira.close.assert_not_called()
+
+    @override_settings(JIRA_CONNECTION_CACHE_TIMEOUT=300)
+    def test_expired_connection_is_closed_and_replaced(self, connect_mock):
+        with patch("dojo.jira_link.helper.time.monotonic", return_value=1000):
+            jira = self.get_connection()
+        with patch("dojo.jira_link.helper.time.monotonic", return_value=1000 + 300):
+            self.assertIsNot(self.get_connection(), jira)
+        jira.close.assert_called_once_with()
+        self.assertEqual(connect_mock.call_count, 2)
+
+    @override_settings(JIRA_CONNECTION_CACHE_TIMEOUT=300)
+    def test_close_jira_connections(self, connect_mock):
+        jira = self.get_connection()
+        jira_helper.close_jira_connections()
+        jira.close.assert_called_once_with()
+        self.assertIsNot(self.get_connection(), jira)
+
+    @override_settings(JIRA_CONNECTION_CACHE_TIMEOUT=300)
+    def test_rejected_credentials_evict_connection(self, connect_mock):
+        jira = self.get_connection()
+        hook = jira._session.hooks["response"][0]
+        hook(MagicMock(status_code=200))
+        self.assertIs(self.get_connection(), jira)
+        hook(MagicMock(status_code=401))
+        self.assertIsNot(self.get_connection(), jira)
+        self.assertEqual(connect_mock.call_count, 2)
+
+    @override_settings(JIRA_CONNECTION_CACHE_TIMEOUT=300)
+    def test_worker_shutdown_closes_connections(self, connect_mock):
+        from dojo.celery import close_jira_connections
+
+        jira = self.get_connection()
+        close_jira_connections()
+        jira.close.assert_called_once_with()
+
+
+class JIRAProjectLookupTest(DojoTestCase):
+    fixtures = ["dojo_testdata.json"]
+
+    def setUp(self):
+        super().setUp()
+        self.system_settings(enable_jira=True)
+
+    def test_get_jira_project_key(self):
+        self.assertEqual(jira_helper.get_jira_project_key(Product.objects.get(id=1)), JIRA_Project.objects.get(id=1).project_key)
+
+    def test_get_jira_project_key_without_jira_project(self):
+        self.assertIsNone(jira_helper.get_jira_project_key(Product.objects.get(id=3)))
+
+    def test_get_jira_status_without_jira_issue(self):
+        self.assertIsNone(jira_helper.get_jira_status(Finding.objects.get(id=2)))
+
+
+class JIRAPushStatusTest(DojoTestCase):
+    fixtures = ["dojo_testdata.json"]
+
+    def setUp(self):
+        super().setUp()
+        self.jira = MagicMock()
+        self.jira_instance = SimpleNamespace(close_status_key=2, open_status_key=3)
+
+    def push_status(self, status, resolution=None):
+        obj = SimpleNamespace(status=lambda: status, jira_issue=MagicMock())
+        issue = SimpleNamespace(fields=SimpleNamespace(resolution=resolution))
+        jira_helper.push_status_to_jira(obj, self.jira_instance, self.jira, issue, save=True)
+        return obj, issue
+
+    def test_push_status_without_open_or_resolved_status(self):
+        obj, _ = self.push_status("Initial")
+        self.jira.transition_issue.assert_not_called()
+        obj.jira_issue.save.assert_not_called()
+
+    def test_push_status_resolves_active_issue(self):
+        obj, issue = self.push_status("Inactive, Verified, Mitigated")
+        self.jira.transition_issue.assert_called_once_with(issue, 2)
+        obj.jira_issue.save.assert_called_once_with()
+
+    def test_push_status_reopens_resolved_issue(self):
+        _, issue = self.push_status("Active, Verified", resolution={"name": "Done"})
+        self.jira.transition_issue.assert_called_once_with(issue, 3)
+
+    def test_push_status_without_space_after_separator(self):
+        _, issue = self.push_status("Inactive,Mitigated")
+        self.jira.transition_issue.assert_called_once_with(issue, 2)
+
+    def test_push_status_of_finding_group(self):
+        # a group reports a single status, Mitigated once all of its findings are
+        Finding.objects.filter(id=5).update(active=False, is_mitigated=True)
+        finding_group = Finding_Group.objects.create(name="group", test_id=3, creator=Dojo_User.objects.get(id=1))
+        finding_group.findings.add(5)
+        issue = SimpleNamespace(fields=SimpleNamespace(resolution=None))
+        jira_helper.push_status_to_jira(finding_group, self.jira_instance, self.jira, issue)
+        self.jira.transition_issue.assert_called_once_with(issue, 2)
+
+    def test_push_status_already_resolved(self):
+        obj, _ = self.push_status("Inactive", resolution={"name": "Done"})
+        self.jira.transition_issue.assert_not_called()
+        obj.jira_issue.save.assert_not_called()
+
+
+class JIRAUpdateIssueEpicTest(DojoTestCase):
+    fixtures = ["dojo_testdata.json"]
+
+    def setUp(self):
+        super().setUp()
+        self.system_settings(enable_jira=True)
+        self.finding = Finding.objects.get(id=5)
+        jira_project = jira_helper.get_jira_project(self.finding)
+        jira_project.enable_engagement_epic_mapping = True
+        jira_project.save()
+
+    @patch("dojo.jira_link.helper.add_issues_to_epic")
+    @patch("dojo.jira_link.helper.get_file_images", side_effect=Exception("no media"))
+    @patch("dojo.jira_link.helper.push_status_to_jira")
+    @patch("dojo.jira_link.helper.prepare_jira_issue_fields", return_value={"summary": "summary", "description": "description"})
+    @patch("dojo.jira_link.helper.jira_description", return_value="description")
+    @patch("dojo.jira_link.helper.get_cached_issuetype_fields", return_value=[])
+    @patch("dojo.jira_link.helper.get_jira_connection")
+    def test_epic_mapping_after_failed_attachments(self, jira_mock, *mocks):
+        add_issues_to_epic_mock = mocks[-1]
+        jira_mock.return_value.issue.return_value.fields.labels = []
+
+        # the attachments loop failing before its first iteration must not break the epic mapping
+        self.assertTrue(jira_helper.update_jira_issue(self.finding))
+        add_issues_to_epic_mock.assert_called_once()
+        self.assertEqual(add_issues_to_epic_mock.call_args.kwargs["epic_id"], "333")
+
+
+class JIRACloseEpicTest(DojoTestCase):
+    fixtures = ["dojo_testdata.json"]
+
+    def setUp(self):
+        super().setUp()
+        self.system_settings(enable_jira=True)
+        # has an epic in jira
+        self.engagement = Engagement.objects.get(id=1)
+        jira_project = jira_helper.get_jira_project(self.engagement)
+        jira_project.enable_engagement_epic_mapping = True
+        jira_project.save()
+        self.close_status_key = jira_helper.get_jira_instance(self.engagement).close_status_key
+
+    @patch("dojo.jira_link.helper.get_jira_connection")
+    def test_close_epic(self, jira_mock):
+        self.assertTrue(jira_helper.close_epic(self.engagement, push_to_jira=True, sync=True))
+        jira_mock.return_value.transition_issue.assert_called_once_with("333", self.close_status_key)
+
+    @patch("dojo.jira_link.helper.get_jira_connection")
+    def test_close_epic_without_push_to_jira(self, jira_mock):
+        self.assertIsNone(jira_helper.close_epic(self.engagement, push_to_jira=False, sync=True))
+        jira_mock.assert_not_called()
+
+    @patch("dojo.jira_link.helper.get_jira_connection")
+    def test_close_epic_rejected_by_jira(self, jira_mock):
+        jira_mock.return_value.transition_issue.side_effect = JIRAError(status_code=400, text="transition not allowed")
+        self.assertFalse(jira_helper.close_epic(self.engagement, push_to_jira=True, sync=True))
+
+
+class JIRAUpdateIssueLabelsTest(DojoTestCase):
+    fixtures = ["dojo_testdata.json"]
+
+    def setUp(self):
+        super().setUp()
+        self.system_settings(enable_jira=True)
+        self.finding = Finding.objects.get(id=5)
+
+    @patch("dojo.jira_link.helper.add_issues_to_epic")
+    @patch("dojo.jira_link.helper.get_file_images", return_value=[])
+    @patch("dojo.jira_link.helper.push_status_to_jira")
+    @patch("dojo.jira_link.helper.prepare_jira_issue_fields", return_value={"summary": "summary", "description": "description"})
+    @patch("dojo.jira_link.helper.jira_description", return_value="description")
+    @patch("dojo.jira_link.helper.get_cached_issuetype_fields", return_value=[])
+    @patch("dojo.jira_link.helper.get_tags", return_value=["tag", "security"])
+    @patch("dojo.jira_link.helper.get_labels", return_value=["security"])
+    @patch("dojo.jira_link.helper.get_jira_connection")
+    def test_labels_already_on_the_issue_are_not_repeated(self, jira_mock, get_labels_mock, get_tags_mock, get_cached_issuetype_fields_mock, jira_description_mock, prepare_jira_issue_fields_mock, *mocks):
+        jira_mock.return_value.issue.return_value.fields.labels = ["security", "manual", "tag"]
+
+        self.assertTrue(jira_helper.update_jira_issue(self.finding))
+        self.assertEqual(prepare_jira_issue_fields_mock.call_args.kwargs["labels"], ["security", "tag", "manual"])
+
+
+@patch("dojo.models.Finding.save")
+class JIRASaveAndPushTest(DojoTestCase):
+    fixtures = ["dojo_testdata.json"]
+
+    def setUp(self):
+        super().setUp()
+        # has a linked jira issue
+        self.finding = Finding.objects.get(id=5)
+
+    def test_save_and_push_with_jira_disabled(self, save_mock):
+        self.system_settings(enable_jira=False)
+        jira_helper.save_and_push_to_jira(self.finding)
+        save_mock.assert_called_once_with(push_to_jira=False)
+
+    @patch("dojo.jira_link.helper.is_push_all_issues", return_value=False)
+    @patch("dojo.jira_link.helper.get_jira_instance", return_value=None)
+    def test_save_and_push_without_jira_instance(self, get_jira_instance_mock, is_push_all_issues_mock, save_mock):
+        self.system_settings(enable_jira=True)
+        jira_helper.save_and_push_to_jira(self.finding)
+        save_mock.assert_called_once_with(push_to_jira=False)
+
+    @patch("dojo.jira_link.helper.push_to_jira")
+    @patch("dojo.jira_link.helper.is_push_all_issues", return_value=True)
+    def test_save_and_push_with_push_all_issues(self, is_push_all_issues_mock, push_to_jira_mock, save_mock):
+        self.system_settings(enable_jira=True)
+        jira_helper.save_and_push_to_jira(self.finding)
+        save_mock.assert_called_once_with(push_to_jira=True)
+        push_to_jira_mock.assert_not_called()
+
+
+class JIRAProcessResolutionTest(DojoTestCase):
+    fixtures = ["dojo_testdata.json"]
+
+    def setUp(self):
+        super().setUp()
+        # has an endpoint, risk accepted so that resolving it pushes it to jira through risk_unaccept
+        Finding.objects.filter(id=2).update(risk_accepted=True)
+        self.finding = Finding.objects.get(id=2)
+        self.jira_issue = JIRA_Issue.objects.get(id=2)
+
+    @patch("dojo.risk_acceptance.helper.post_jira_comment")
+    @patch("dojo.jira_link.helper.save_and_push_to_jira")
+    def test_mitigated_finding_is_committed_before_push(self, save_and_push_to_jira_mock, post_jira_comment_mock):
+        atomic_depth = len(connection.atomic_blocks)
+        pushed = {}
+
+        def save_and_push_to_jira(finding):
+            stored = Finding.objects.get(id=finding.id)
+            pushed["atomic_depth"] = len(connection.atomic_blocks)
+            pushed["is_mitigated"] = stored.is_mitigated
+            pushed["has_endpoints"] = stored.endpoints.exists()
+
+        save_and_push_to_jira_mock.side_effect = save_and_push_to_jira
+
+        self.assertTrue(jira_helper.process_resolution_from_jira(self.finding, "1", "Done", None, timezone.now(), self.jira_issue))
+        # the push is not queued from inside a transaction, and sees the mitigation without the endpoints
+        self.assertEqual(pushed, {"atomic_depth": atomic_depth, "is_mitigated": True, "has_endpoints": False})
+        post_jira_comment_mock.assert_called_once()
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from dojo.models import Finding, Product
+from dojo.request_cache import cache_model_for_request
+from dojo.request_cache.middleware import RequestCache
+
+from .dojo_test_case import DojoTestCase
+
+
+class CacheModelForRequestTest(DojoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.calls = []
+
+        @cache_model_for_request
+        def describe(obj):
+            self.calls.append(obj)
+            return f"{type(obj).__name__}:{obj.pk}"
+
+        self.describe = describe
+        request_patcher = patch("dojo.request_cache.get_current_request", return_value=SimpleNamespace(cache=RequestCache()))
+        self.get_current_request_mock = request_patcher.start()
+        self.addCleanup(request_patcher.stop)
+
+    def test_keeps_function_name(self):
+        self.assertEqual(self.describe.__name__, "describe")
+
+    def test_cached_per_object(self):
+        product = Product(pk=1)
+        self.assertEqual(self.describe(product), "Product:1")
+        self.assertEqual(self.describe(Product(pk=1)), "Product:1")
+        self.assertEqual(len(self.calls), 1)
+
+    def test_models_with_same_pk_do_not_collide(self):
+        self.assertEqual(self.describe(Product(pk=1)), "Product:1")
+        self.assertEqual(self.describe(Finding(pk=1)), "Finding:1")
+        self.assertEqual(len(self.calls), 2)
+
+    def test_objects_without_pk_are_not_cached(self):
+        self.describe(Product())
+        self.describe(Product())
+        self.describe(None)
+        self.assertEqual(len(self.calls), 3)
+
+    def test_not_cached_outside_request(self):
+        self.get_current_request_mock.return_value = None
+        self.describe(Product(pk=1))
+        self.describe(Product(pk=1))
+        self.assertEqual(len(self.calls), 2)